@@ -29,8 +29,19 @@ CREATE TABLE IF NOT EXISTS metadata.voter_ingestion_audit (
     inserted_row_count BIGINT NOT NULL,
     load_status VARCHAR NOT NULL,
     dag_run_id VARCHAR,
+    file_size_bytes BIGINT,
+    file_mtime_ns BIGINT,
+    hash_algorithm VARCHAR,
     ingested_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- Backfill for databases created before the newer audit columns existed
+ALTER TABLE metadata.voter_ingestion_audit
+    ADD COLUMN IF NOT EXISTS file_size_bytes BIGINT;
+ALTER TABLE metadata.voter_ingestion_audit
+    ADD COLUMN IF NOT EXISTS file_mtime_ns BIGINT;
+ALTER TABLE metadata.voter_ingestion_audit
+    ADD COLUMN IF NOT EXISTS hash_algorithm VARCHAR;
+
 CREATE INDEX IF NOT EXISTS idx_voter_ingestion_file_hash
     ON metadata.voter_ingestion_audit (file_hash);
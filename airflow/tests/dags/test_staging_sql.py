@@ -0,0 +1,53 @@
+"""Smoke test for the DuckDB staging SQL used by the voter ingestion DAG. Executes the CSV-to-Parquet COPY against a tiny CSV so template/binding regressions surface without a full Airflow run."""
+
+import sys
+from pathlib import Path
+
+import duckdb
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "dags"))
+
+from utils.helpers import build_csv_to_parquet_sql  # noqa: E402
+
+# Mirrors the DAG's fixed voter CSV schema (raw mirrors the file as VARCHAR).
+COLUMN_TYPES = {
+    column: "VARCHAR"
+    for column in (
+        "id",
+        "first_name",
+        "last_name",
+        "age",
+        "gender",
+        "state",
+        "party",
+        "email",
+        "registered_date",
+        "last_voted_date",
+        "updated_at",
+    )
+}
+
+
+def test_copy_csv_to_parquet_executes(tmp_path):
+    """The staging COPY runs end to end: CSV in, readable Parquet out."""
+    csv_path = tmp_path / "voters.csv"
+    csv_path.write_text(
+        ",".join(COLUMN_TYPES)
+        + "\n"
+        + "1,Ada,Lovelace,36,F,CA,Independent,ada@example.com,2020-01-01,2024-11-05,2024-11-06\n"
+        + "2,Alan,Turing,41,M,NY,Democrat,alan@example.com,2019-05-02,2022-11-08,2022-11-09\n"
+    )
+    parquet_path = tmp_path / "voters.parquet"
+
+    with duckdb.connect() as conn:
+        conn.execute(
+            build_csv_to_parquet_sql(COLUMN_TYPES, str(parquet_path)),
+            (str(csv_path),),
+        )
+        staged = conn.execute(
+            "SELECT id, state FROM read_parquet(?) ORDER BY id",
+            (str(parquet_path),),
+        ).fetchall()
+
+    assert parquet_path.exists()
+    assert staged == [("1", "CA"), ("2", "NY")]
@@ -5,18 +5,23 @@ Interactive visualizations for voter registration and engagement data.
 
 from __future__ import annotations
 
+import glob
+import hashlib
 import os
-from pathlib import Path
 from datetime import datetime
 import shutil
 import tempfile
 
 import duckdb
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import pyarrow as pa
 import streamlit as st
 
+# Plotly is imported lazily inside the page renderers: it costs ~150 ms and
+# pulls large sub-packages, and each Streamlit rerun re-executes this module.
+# sys.modules makes the per-call import a dict lookup after the first page view.
+
 # ---------------------------------------------------------------------------
 # Page + style configuration
 # ---------------------------------------------------------------------------
@@ -59,8 +64,23 @@ st.markdown(
 # ---------------------------------------------------------------------------
 DEFAULT_DB_PATH = "/usr/local/airflow/include/data/processed/goodparty.duckdb"
 DUCKDB_PATH = os.getenv("DUCKDB_PATH", DEFAULT_DB_PATH)
+# Writable result cache; the warehouse connection itself is read-only.
+CACHE_DB_PATH = os.getenv(
+    "DASHBOARD_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "goodparty_dashboard_cache.duckdb"),
+)
 DBT_MART_SCHEMA = os.getenv("DBT_MART_SCHEMA", "main_marts")
+# Directory where dbt writes externally-materialized (Parquet) marts.
+DBT_MARTS_DIR = os.getenv(
+    "DBT_MARTS_DIR", "/usr/local/airflow/include/data/processed/marts"
+)
 GENERATION_ORDER = ["gen_z", "millennial", "gen_x", "boomer", "silent"]
+# (mart column, display label, trace color) for the party trend traces.
+PARTY_SERIES = [
+    ("democrat_registrations", "democrat", "#1f77b4"),
+    ("republican_registrations", "republican", "#E74C3C"),
+    ("independent_registrations", "independent", "#F1C40F"),
+]
 GENERATION_COLOR_MAP = {
     "gen_z": "#F9C74F",
     "millennial": "#43AA8B",
@@ -75,77 +95,350 @@ def _qualified_relation(table_name: str, schema: str | None = None) -> str:
     return f"{schema or DBT_MART_SCHEMA}.{table_name}"
 
 
+def _trends_relation() -> str:
+    """Return the relation to scan for registration trends.
+
+    dbt writes registration_trends as a Parquet dataset partitioned by
+    registration_year, so reading the files directly lets DuckDB prune
+    whole year partitions against the date-window predicate. Falls back
+    to the warehouse view when the export directory is absent.
+    """
+    pattern = os.path.join(DBT_MARTS_DIR, "registration_trends", "*", "*.parquet")
+    if glob.glob(pattern):
+        return f"read_parquet('{pattern}', hive_partitioning=true)"
+    return _qualified_relation("registration_trends")
+
+
+def _get_cursor() -> duckdb.DuckDBPyConnection:
+    """Return a fresh cursor on the shared connection.
+
+    A cursor per query lets concurrent session threads run against the
+    shared read-only connection without serializing on one handle.
+    """
+    return get_connection().cursor()
+
+
+def _tune_connection(conn: duckdb.DuckDBPyConnection) -> duckdb.DuckDBPyConnection:
+    """Apply scan-cache and resource pragmas to the shared connection.
+
+    The object cache keeps decompressed column chunks resident, so the first
+    cold query after a pipeline refresh warms every later mart scan; the
+    thread and memory pragmas bound how much of the host the dashboard takes
+    from the Airflow workers it shares it with.
+    """
+    conn.execute("PRAGMA enable_object_cache=true")
+    conn.execute("PRAGMA threads=4")
+    conn.execute("PRAGMA memory_limit='2GB'")
+    return conn
+
+
 @st.cache_resource(show_spinner=False)
 def get_connection() -> duckdb.DuckDBPyConnection:
     """Create a cached DuckDB connection, falling back to a snapshot if locked."""
-    db_path = Path(DUCKDB_PATH)
-    if not db_path.exists():
-        st.error(f"DuckDB warehouse not found at `{db_path}`. Run the Airflow + dbt pipeline first.")
+    if not os.path.exists(DUCKDB_PATH):
+        st.error(f"DuckDB warehouse not found at `{DUCKDB_PATH}`. Run the Airflow + dbt pipeline first.")
         st.stop()
 
     try:
-        return duckdb.connect(database=str(db_path), read_only=True)
+        return _tune_connection(duckdb.connect(database=DUCKDB_PATH, read_only=True))
     except duckdb.IOException as exc:
         if "could not set lock" not in str(exc).lower():
             raise
-        snapshot_path = _create_snapshot(db_path)
-        return duckdb.connect(database=str(snapshot_path), read_only=True)
+
+    # The writer holds the lock, and a read-only ATTACH contends for the
+    # same shared file lock, so the only way in is to snapshot the file
+    # and read the copy.
+    snapshot_path = _create_snapshot(DUCKDB_PATH)
+    return _tune_connection(duckdb.connect(database=snapshot_path, read_only=True))
 
 
-def _create_snapshot(db_path: Path) -> Path:
+def _create_snapshot(db_path: str) -> str:
     """Copy the DuckDB file (and WAL file if present) to a temp directory."""
-    snapshot_dir = Path(tempfile.mkdtemp(prefix="goodparty_duckdb_snapshot_"))
-    snapshot_path = snapshot_dir / db_path.name
+    snapshot_dir = tempfile.mkdtemp(prefix="goodparty_duckdb_snapshot_")
+    snapshot_path = os.path.join(snapshot_dir, os.path.basename(db_path))
     shutil.copy2(db_path, snapshot_path)
 
-    wal_path = db_path.with_suffix(db_path.suffix + ".wal")
-    if wal_path.exists():
-        shutil.copy2(wal_path, snapshot_path.with_suffix(snapshot_path.suffix + ".wal"))
+    wal_path = db_path + ".wal"
+    if os.path.exists(wal_path):
+        shutil.copy2(wal_path, snapshot_path + ".wal")
 
     return snapshot_path
 
 
-def _run_query(sql: str) -> pd.DataFrame:
-    conn = get_connection()
-    return conn.execute(sql).df()
+def _run_query(sql: str, params: tuple = ()) -> pd.DataFrame:
+    # Fetch through Arrow and keep the Arrow buffers as column storage
+    # (ArrowDtype) instead of df(), which copies every column into NumPy.
+    return _get_cursor().execute(sql, params).fetch_arrow_table().to_pandas(
+        types_mapper=pd.ArrowDtype
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _get_cache_connection() -> duckdb.DuckDBPyConnection:
+    """Open the writable result-cache database, creating it on first use."""
+    conn = duckdb.connect(CACHE_DB_PATH)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entries (
+            key BLOB,
+            ver BIGINT,
+            payload BLOB,
+            PRIMARY KEY (key, ver)
+        )
+        """
+    )
+    return conn
+
+
+def cached_query(sql: str, params: tuple = ()) -> pd.DataFrame:
+    """Run a query through the persistent DuckDB-backed result cache.
+
+    Entries are keyed by a hash of (sql, params) plus the warehouse file
+    mtime, so invalidation is exact — the key flips the moment the pipeline
+    rewrites the warehouse, with no TTL staleness window. Payloads are Arrow
+    IPC streams, so a hit costs a point read on the cache table plus a
+    zero-copy Arrow deserialize, and survives dashboard restarts where
+    st.cache_data would start cold.
+    """
+    ver = _warehouse_version()
+    key = hashlib.blake2b(repr((sql, params)).encode(), digest_size=8).digest()
+    # Cursor per call, as in _get_cursor: concurrent session threads must
+    # not interleave execute/fetch on the shared cache handle.
+    cache = _get_cache_connection().cursor()
+    hit = cache.execute(
+        "SELECT payload FROM entries WHERE key = ? AND ver = ?", (key, ver)
+    ).fetchone()
+    if hit is not None:
+        table = pa.ipc.open_stream(hit[0]).read_all()
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    table = _get_cursor().execute(sql, params).fetch_arrow_table()
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    # One live version per key keeps the cache file from accreting stale
+    # rows; OR REPLACE makes concurrent misses on the same key upsert
+    # instead of colliding on the primary key.
+    cache.execute("DELETE FROM entries WHERE key = ? AND ver <> ?", (key, ver))
+    cache.execute(
+        "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+        (key, ver, sink.getvalue().to_pybytes()),
+    )
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _rolling_and_cumsum_kernel(x: np.ndarray, w: int) -> tuple[np.ndarray, np.ndarray]:
+    n = x.size
+    ma = np.empty(n)
+    cum = np.empty(n)
+    window_sum = 0.0
+    total = 0.0
+    for i in range(n):
+        total += x[i]
+        cum[i] = total
+        window_sum += x[i]
+        if i >= w:
+            window_sum -= x[i - w]
+        ma[i] = window_sum / (w if i >= w - 1 else i + 1)
+    return ma, cum
+
+
+_rolling_and_cumsum_impl = None
+
+
+def _rolling_and_cumsum(x: np.ndarray, w: int) -> tuple[np.ndarray, np.ndarray]:
+    """Trailing w-point rolling mean and cumulative sum in one O(N) pass.
+
+    Used when the moving-average window control deviates from the 5-month
+    default the mart precomputes. numba is imported on first call — same
+    lazy pattern as plotly, since its import dwarfs the work it speeds up —
+    and JIT-compiles the kernel when installed (cache=True keeps the
+    compilation out of later calls); the plain Python loop is fast enough
+    for monthly-grain series without it.
+    """
+    global _rolling_and_cumsum_impl
+    if _rolling_and_cumsum_impl is None:
+        try:
+            import numba
+
+            _rolling_and_cumsum_impl = numba.njit(cache=True, fastmath=True)(
+                _rolling_and_cumsum_kernel
+            )
+        except ImportError:
+            _rolling_and_cumsum_impl = _rolling_and_cumsum_kernel
+    return _rolling_and_cumsum_impl(x, w)
+
+
+def _downsample(df: pd.DataFrame, max_points: int = 500) -> pd.DataFrame:
+    """Cap a time-ordered frame at max_points rows with an even index stride.
+
+    Plotly serializes every point into the figure JSON and renders it in
+    SVG, so decade-plus trend windows degrade the browser long before the
+    chart gains any visible detail. A linspace stride keeps the endpoints
+    and overall shape of the (smooth) trend curves.
+    """
+    if len(df) <= max_points:
+        return df
+    idx = np.linspace(0, len(df) - 1, max_points).astype(int)
+    return df.iloc[idx]
 
 
 # ---------------------------------------------------------------------------
 # Cached data loaders
+#
+# Filters are pushed into DuckDB as bind parameters so only matching rows
+# cross into pandas; the caches key on the filter arguments, so each filter
+# state caches independently.
+#
+# Loaders without user-supplied filters use st.cache_resource: the marts are
+# read-only between pipeline runs, so the DataFrame object is shared
+# in-process with no per-rerun serialization. Their `version` argument is the
+# warehouse file mtime, which flips the cache key when dbt rewrites the
+# warehouse; max_entries=2 releases the superseded version's frames instead
+# of pinning one copy per pipeline run for the life of the process. Parameterized loaders stay on st.cache_data, whose serialized
+# copies keep per-session filter results isolated.
 # ---------------------------------------------------------------------------
-@st.cache_data(ttl=300, show_spinner=False)
-def load_state_summary() -> pd.DataFrame:
-    return _run_query(f"select * from {_qualified_relation('voter_state_summary')} order by total_voters desc")
+def _warehouse_version() -> int:
+    """Return the warehouse file mtime for use as a cache-busting key."""
+    try:
+        return os.stat(DUCKDB_PATH).st_mtime_ns
+    except OSError:
+        return 0
 
 
 @st.cache_data(ttl=300, show_spinner=False)
-def load_party_distribution() -> pd.DataFrame:
-    return _run_query(f"select * from {_qualified_relation('voter_party_distribution')}")
+def load_state_summary(states: tuple = ()) -> pd.DataFrame:
+    return cached_query(
+        f"""
+        select *
+        from {_qualified_relation('voter_state_summary')}
+        where ? = [] or state_code = any(?)
+        order by total_voters desc
+        """,
+        (list(states), list(states)),
+    )
 
 
 @st.cache_data(ttl=300, show_spinner=False)
-def load_engagement_metrics() -> pd.DataFrame:
-    return _run_query(f"select * from {_qualified_relation('voter_engagement_metrics')}")
+def load_top_states(states: tuple = (), limit: int = 10) -> pd.DataFrame:
+    return cached_query(
+        f"""
+        select *
+        from {_qualified_relation('voter_state_summary')}
+        where ? = [] or state_code = any(?)
+        order by total_voters desc
+        limit ?
+        """,
+        (list(states), list(states), limit),
+    )
 
 
-@st.cache_data(ttl=300, show_spinner=False)
-def load_demographic_crosstab() -> pd.DataFrame:
-    return _run_query(f"select * from {_qualified_relation('demographic_crosstab')}")
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_state_codes(version: int) -> list:
+    return (
+        _run_query(
+            f"""
+            select distinct state_code
+            from {_qualified_relation('voter_state_summary')}
+            order by state_code
+            """
+        )["state_code"]
+        .tolist()
+    )
 
 
-@st.cache_data(ttl=300, show_spinner=False)
-def load_registration_trends() -> pd.DataFrame:
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_generation_totals(version: int) -> pd.DataFrame:
     return _run_query(
         f"""
-        select *
-        from {_qualified_relation('registration_trends')}
-        order by registration_month
+        select generation, sum(voter_count) as voter_count
+        from {_qualified_relation('demographic_crosstab')}
+        group by generation
+        order by list_position({GENERATION_ORDER!r}, generation)
+        """
+    )
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_gender_party_totals(version: int) -> pd.DataFrame:
+    return _run_query(
+        f"""
+        select party, gender, sum(voter_count) as voter_count
+        from {_qualified_relation('demographic_crosstab')}
+        group by party, gender
+        order by party, gender
+        """
+    )
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_party_generation_totals(version: int) -> pd.DataFrame:
+    return _run_query(
+        f"""
+        select party, generation, sum(voter_count) as voter_count
+        from {_qualified_relation('demographic_crosstab')}
+        group by party, generation
+        order by party, list_position({GENERATION_ORDER!r}, generation)
+        """
+    )
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_overview_bundle(version: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Fetch the two Overview chart marts on one cursor in a single batch.
+
+    One cache entry, one connection checkout, and back-to-back executes let
+    DuckDB reuse the warmed buffer pool across the scans instead of paying
+    separate loader round trips on the landing page.
+    """
+    cursor = _get_cursor()
+    party, engagement = (
+        cursor.execute(f"select * from {_qualified_relation(mart)}")
+        .fetch_arrow_table()
+        .to_pandas(types_mapper=pd.ArrowDtype)
+        for mart in (
+            "voter_party_distribution",
+            "voter_engagement_metrics",
+        )
+    )
+    return party, engagement
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_overview_kpis(version: int) -> pd.DataFrame:
+    """Compute the four Overview KPI scalars in one DuckDB query."""
+    return _run_query(
+        f"""
+        select
+            (select sum(total_voters)
+             from {_qualified_relation('voter_party_distribution')}) as total_voters,
+            (select sum(voter_count)
+             from {_qualified_relation('voter_engagement_metrics')}
+             where voter_status = 'active_2024') as active_2024,
+            (select count(distinct state_code)
+             from {_qualified_relation('voter_state_summary')}) as states_covered,
+            (select avg(avg_age)
+             from {_qualified_relation('voter_party_distribution')}) as avg_age
         """
     )
 
 
 @st.cache_data(ttl=300, show_spinner=False)
-def load_data_quality() -> pd.DataFrame:
+def load_registration_trends(start_date=None, end_date=None) -> pd.DataFrame:
+    return cached_query(
+        f"""
+        select *
+        from {_trends_relation()}
+        where (? is null or registration_month >= ?)
+          and (? is null or registration_month <= ?)
+        order by registration_month
+        """,
+        (start_date, start_date, end_date, end_date),
+    )
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_data_quality(version: int) -> pd.DataFrame:
     return _run_query(f"select * from {_qualified_relation('dq_summary')}")
 
 
@@ -194,19 +487,20 @@ def main() -> None:
 # ---------------------------------------------------------------------------
 def show_overview() -> None:
     st.header("📊 Voter Registration Overview")
+    import plotly.graph_objects as go
 
-    party_data = load_party_distribution()
-    engagement_data = load_engagement_metrics()
-    state_data = load_state_summary()
+    version = _warehouse_version()
+    party_data, engagement_data = load_overview_bundle(version)
 
-    if party_data.empty or engagement_data.empty or state_data.empty:
+    if party_data.empty or engagement_data.empty:
         st.warning("No mart data available. Ensure dbt models have been executed.")
         return
 
-    total_voters = party_data["total_voters"].sum()
-    active_voters = engagement_data.loc[engagement_data["voter_status"] == "active_2024", "voter_count"].sum()
-    states_covered = state_data["state_code"].nunique()
-    avg_age = party_data["avg_age"].mean()
+    kpis = load_overview_kpis(version).iloc[0]
+    total_voters = int(kpis["total_voters"])
+    active_voters = 0 if pd.isna(kpis["active_2024"]) else int(kpis["active_2024"])
+    states_covered = int(kpis["states_covered"])
+    avg_age = float(kpis["avg_age"])
 
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Registered Voters", f"{total_voters:,}")
@@ -219,17 +513,19 @@ def show_overview() -> None:
 
     with col1:
         st.subheader("Party Affiliation Distribution")
-        fig = px.pie(
-            party_data,
-            values="total_voters",
-            names="party",
-            hole=0.45,
-            color="party",
-            color_discrete_map={
-                "Democrat": "#2E86C1",
-                "Republican": "#E74C3C",
-                "Independent": "#95A5A6",
-            },
+        party_colors = {
+            "Democrat": "#2E86C1",
+            "Republican": "#E74C3C",
+            "Independent": "#95A5A6",
+        }
+        parties = party_data["party"].to_numpy()
+        fig = go.Figure(
+            go.Pie(
+                labels=parties,
+                values=party_data["total_voters"].to_numpy(),
+                hole=0.45,
+                marker=dict(colors=[party_colors.get(p, "#95A5A6") for p in parties]),
+            )
         )
         fig.update_layout(height=400, legend_title="Party")
         st.plotly_chart(fig, use_container_width=True)
@@ -239,18 +535,20 @@ def show_overview() -> None:
         engagement_summary = (
             engagement_data.groupby("voter_status", as_index=False)["voter_count"].sum().sort_values("voter_count", ascending=False)
         )
-        fig = px.bar(
-            engagement_summary,
-            x="voter_status",
-            y="voter_count",
-            color="voter_status",
-            color_discrete_map={
-                "active_2024": "#2ECC71",
-                "active_2022": "#F39C12",
-                "active_2020": "#E67E22",
-                "inactive": "#95A5A6",
-                "never_voted": "#E74C3C",
-            },
+        status_colors = {
+            "active_2024": "#2ECC71",
+            "active_2022": "#F39C12",
+            "active_2020": "#E67E22",
+            "inactive": "#95A5A6",
+            "never_voted": "#E74C3C",
+        }
+        statuses = engagement_summary["voter_status"].to_numpy()
+        fig = go.Figure(
+            go.Bar(
+                x=statuses,
+                y=engagement_summary["voter_count"].to_numpy(),
+                marker_color=[status_colors.get(s, "#95A5A6") for s in statuses],
+            )
         )
         fig.update_layout(height=400, showlegend=False, xaxis_title="Engagement Status", yaxis_title="Voters")
         st.plotly_chart(fig, use_container_width=True)
@@ -258,18 +556,21 @@ def show_overview() -> None:
 
 def show_geographic() -> None:
     st.header("🗺️ Geographic Analysis")
+    import plotly.express as px
+    import plotly.graph_objects as go
+
     state_data = load_state_summary()
     if state_data.empty:
         st.warning("State summary mart is empty. Run dbt first.")
         return
 
     states = st.multiselect(
-        "Filter States (leave blank for all)", options=sorted(state_data["state_code"].unique()), default=[]
+        "Filter States (leave blank for all)", options=load_state_codes(_warehouse_version()), default=[]
     )
     if states:
-        state_data = state_data[state_data["state_code"].isin(states)]
+        state_data = load_state_summary(tuple(states))
 
-    top_states = state_data.nlargest(10, "total_voters")
+    top_states = load_top_states(tuple(states))
 
     col1, col2 = st.columns(2)
     with col1:
@@ -331,45 +632,37 @@ def show_geographic() -> None:
         "independent_pct",
         "email_quality_pct",
     ]
-    formatted = state_data[display_cols].copy()
-    st.dataframe(
-        formatted.style.format(
-            {
-                "total_voters": "{:,.0f}",
-                "avg_age": "{:.1f}",
-                "democrat_pct": "{:.1f}%",
-                "republican_pct": "{:.1f}%",
-                "independent_pct": "{:.1f}%",
-                "email_quality_pct": "{:.1f}%",
-            }
-        ),
-        use_container_width=True,
+    # Format once into string columns; Styler re-dispatches a Python
+    # formatter per cell on every rerun.
+    formatted = state_data[display_cols].assign(
+        total_voters=state_data["total_voters"].map("{:,.0f}".format),
+        avg_age=state_data["avg_age"].map("{:.1f}".format),
+        democrat_pct=state_data["democrat_pct"].map("{:.1f}%".format),
+        republican_pct=state_data["republican_pct"].map("{:.1f}%".format),
+        independent_pct=state_data["independent_pct"].map("{:.1f}%".format),
+        email_quality_pct=state_data["email_quality_pct"].map("{:.1f}%".format),
     )
+    st.dataframe(formatted, use_container_width=True)
 
 
 def show_demographics() -> None:
     st.header("🎯 Demographic Analysis")
-    demo_data = load_demographic_crosstab()
-    if demo_data.empty:
+    import plotly.graph_objects as go
+
+    version = _warehouse_version()
+    gen_data = load_generation_totals(version)
+    if gen_data.empty:
         st.warning("Demographic mart is unavailable.")
         return
 
     st.subheader("Voter Distribution by Generation")
-    gen_data = (
-        demo_data.groupby("generation", as_index=False)["voter_count"]
-        .sum()
-        .set_index("generation")
-        .reindex(GENERATION_ORDER, fill_value=0)
-        .reset_index()
-    )
-    gen_data["generation"] = pd.Categorical(gen_data["generation"], categories=GENERATION_ORDER, ordered=True)
-    gen_data = gen_data.sort_values("generation")
-    fig = px.bar(
-        gen_data,
-        x="generation",
-        y="voter_count",
-        color="generation",
-        color_discrete_map=GENERATION_COLOR_MAP,
+    generations = gen_data["generation"].to_numpy()
+    fig = go.Figure(
+        go.Bar(
+            x=generations,
+            y=gen_data["voter_count"].to_numpy(),
+            marker_color=[GENERATION_COLOR_MAP.get(g, "#95A5A6") for g in generations],
+        )
     )
     fig.update_layout(height=420, showlegend=False, xaxis_title="Generation", yaxis_title="Voters")
     st.plotly_chart(fig, use_container_width=True)
@@ -377,42 +670,43 @@ def show_demographics() -> None:
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Gender Distribution by Party")
-        gender_party = demo_data.groupby(["party", "gender"], as_index=False)["voter_count"].sum()
-        fig = px.bar(
-            gender_party,
-            x="party",
-            y="voter_count",
-            color="gender",
-            barmode="group",
-            color_discrete_map={"M": "#3498DB", "F": "#E91E63", "U": "#95A5A6"},
-        )
-        fig.update_layout(height=420, xaxis_title="Party", yaxis_title="Voters")
+        gender_party = load_gender_party_totals(version)
+        fig = go.Figure()
+        for gender, color in (("M", "#3498DB"), ("F", "#E91E63"), ("U", "#95A5A6")):
+            subset = gender_party[gender_party["gender"] == gender]
+            fig.add_trace(
+                go.Bar(
+                    name=gender,
+                    x=subset["party"].to_numpy(),
+                    y=subset["voter_count"].to_numpy(),
+                    marker_color=color,
+                )
+            )
+        fig.update_layout(barmode="group", height=420, xaxis_title="Party", yaxis_title="Voters", legend_title="gender")
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         st.subheader("Age Distribution by Party")
-        party_age = demo_data.groupby(["party", "generation"], as_index=False)["voter_count"].sum()
-        party_age["generation"] = pd.Categorical(party_age["generation"], categories=GENERATION_ORDER, ordered=True)
-        party_age = party_age.sort_values(["party", "generation"])
-        fig = px.bar(
-            party_age,
-            x="party",
-            y="voter_count",
-            color="generation",
-            barmode="stack",
-            category_orders={"generation": GENERATION_ORDER},
-            color_discrete_map=GENERATION_COLOR_MAP,
-        )
-        fig.update_layout(height=420, xaxis_title="Party", yaxis_title="Voters", legend_title="Generation")
+        party_age = load_party_generation_totals(version)
+        fig = go.Figure()
+        # Traces added in GENERATION_ORDER keep the stack order canonical.
+        for generation in GENERATION_ORDER:
+            subset = party_age[party_age["generation"] == generation]
+            fig.add_trace(
+                go.Bar(
+                    name=generation,
+                    x=subset["party"].to_numpy(),
+                    y=subset["voter_count"].to_numpy(),
+                    marker_color=GENERATION_COLOR_MAP[generation],
+                )
+            )
+        fig.update_layout(barmode="stack", height=420, xaxis_title="Party", yaxis_title="Voters", legend_title="Generation")
         st.plotly_chart(fig, use_container_width=True)
 
 
 def show_trends() -> None:
     st.header("📈 Registration & Engagement Trends")
-    trends = load_registration_trends()
-    if trends.empty:
-        st.warning("Registration trends mart is empty.")
-        return
+    import plotly.graph_objects as go
 
     col1, col2 = st.columns(2)
     with col1:
@@ -420,69 +714,108 @@ def show_trends() -> None:
     with col2:
         end_date = st.date_input("End Date", value=pd.to_datetime("2024-12-31"))
 
-    trends["registration_month"] = pd.to_datetime(trends["registration_month"])
-    mask = (trends["registration_month"] >= pd.to_datetime(start_date)) & (
-        trends["registration_month"] <= pd.to_datetime(end_date)
-    )
-    filtered = trends.loc[mask]
+    window = st.slider("Moving Average Window (months)", min_value=2, max_value=12, value=5)
+
+    filtered = load_registration_trends(start_date, end_date)
     if filtered.empty:
         st.info("No data in selected date range.")
         return
 
-    st.subheader("Monthly Registration Trends (5-Month Moving Average)")
-    fig = px.line(
-        filtered,
-        x="registration_month",
-        y="moving_avg_registrations",
-        labels={"moving_avg_registrations": "Registrations"},
-        markers=True,
+    # The mart precomputes the 5-month average; other windows are derived
+    # on the fly from the monthly counts.
+    if window != 5:
+        ma, _ = _rolling_and_cumsum(
+            filtered["new_registrations"].to_numpy(dtype=np.float64), window
+        )
+        filtered = filtered.assign(moving_avg_registrations=ma)
+
+    plotted = _downsample(filtered)
+
+    # Beyond ~3 years of months the per-month scatter is unreadable noise;
+    # quarterly sums keep the overlay legible and a quarter of the size.
+    if len(filtered) > 36:
+        # registration_month arrives as an Arrow-backed DATE; pd.Grouper
+        # needs a datetime64 column, so convert just for the bucketing.
+        actual = (
+            filtered.assign(registration_month=pd.to_datetime(filtered["registration_month"]))
+            .groupby(pd.Grouper(key="registration_month", freq="QS"))["new_registrations"]
+            .sum()
+            .rename_axis("registration_month")
+            .reset_index()
+        )
+        actual_name = "Actual (quarterly)"
+    else:
+        actual = filtered
+        actual_name = "Actual"
+
+    st.subheader(f"Monthly Registration Trends ({window}-Month Moving Average)")
+    fig = go.Figure(
+        go.Scatter(
+            x=plotted["registration_month"],
+            y=plotted["moving_avg_registrations"],
+            mode="lines+markers",
+            name="moving_avg_registrations",
+            line=dict(width=3, color="#1f77b4"),
+        )
     )
-    fig.update_traces(line=dict(width=3, color="#1f77b4"))
-    fig.add_scatter(
-        x=filtered["registration_month"],
-        y=filtered["new_registrations"],
-        mode="markers",
-        name="Actual",
-        opacity=0.3,
-        marker=dict(size=8, color="#A5D8FF"),
+    fig.add_trace(
+        go.Scatter(
+            x=actual["registration_month"],
+            y=actual["new_registrations"],
+            mode="markers",
+            name=actual_name,
+            opacity=0.3,
+            marker=dict(size=8, color="#A5D8FF"),
+        )
     )
     fig.update_layout(
         height=420,
         legend_title=None,
+        xaxis_title="registration_month",
+        yaxis_title="Registrations",
         yaxis=dict(zeroline=True, zerolinecolor="#E0E0E0"),
     )
     st.plotly_chart(fig, use_container_width=True)
 
     st.subheader("Cumulative Registrations")
-    fig = px.area(filtered, x="registration_month", y="cumulative_registrations", labels={"cumulative_registrations": "Cumulative"})
-    fig.update_layout(height=420)
+    fig = go.Figure(
+        go.Scatter(
+            x=plotted["registration_month"],
+            y=plotted["cumulative_registrations"],
+            mode="lines",
+            fill="tozeroy",
+        )
+    )
+    fig.update_layout(height=420, xaxis_title="registration_month", yaxis_title="Cumulative")
     st.plotly_chart(fig, use_container_width=True)
 
     st.subheader("Registration Trends by Party")
-    party_cols = ["democrat_registrations", "republican_registrations", "independent_registrations"]
-    party_trends = filtered[["registration_month"] + party_cols].melt(
-        id_vars="registration_month", var_name="party", value_name="registrations"
-    )
-    party_trends["party"] = party_trends["party"].str.replace("_registrations", "")
-    fig = px.line(
-        party_trends,
-        x="registration_month",
-        y="registrations",
-        color="party",
-        color_discrete_map={
-            "democrat": "#1f77b4",
-            "republican": "#E74C3C",
-            "independent": "#F1C40F",
-        },
+    fig = go.Figure()
+    for column, label, color in PARTY_SERIES:
+        fig.add_trace(
+            go.Scatter(
+                x=plotted["registration_month"],
+                y=plotted[column],
+                name=label,
+                mode="lines",
+                line=dict(color=color, width=2.5),
+            )
+        )
+    fig.update_layout(
+        height=420,
+        legend_title="Party",
+        xaxis_title="registration_month",
+        yaxis_title="registrations",
     )
-    fig.update_traces(line=dict(width=2.5))
-    fig.update_layout(height=420, legend_title="Party")
     st.plotly_chart(fig, use_container_width=True)
 
 
 def show_data_quality() -> None:
     st.header("✅ Data Quality Dashboard")
-    dq_data = load_data_quality()
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    dq_data = load_data_quality(_warehouse_version())
     if dq_data.empty:
         st.warning("Data quality mart is empty.")
         return
@@ -506,28 +839,23 @@ def show_data_quality() -> None:
     st.markdown("---")
     st.subheader("Data Quality Issue Breakdown")
 
-    issues = pd.DataFrame(
-        {
-            "Issue Type": ["Missing Data", "Invalid Age", "Invalid Email"],
-            "Count": [
-                int(row["missing_data_count"]),
-                int(row["invalid_age_count"]),
-                int(row["invalid_email_count"]),
-            ],
-        }
-    )
-    issues["Percentage"] = issues["Count"] / raw_count * 100 if raw_count else 0
+    issue_types = ["Missing Data", "Invalid Age", "Invalid Email"]
+    issue_counts = [
+        int(row["missing_data_count"]),
+        int(row["invalid_age_count"]),
+        int(row["invalid_email_count"]),
+    ]
 
     col1, col2 = st.columns(2)
     with col1:
-        fig = px.bar(
-            issues,
-            x="Issue Type",
-            y="Count",
-            color="Issue Type",
-            color_discrete_sequence=px.colors.qualitative.Set3,
+        fig = go.Figure(
+            go.Bar(
+                x=issue_types,
+                y=issue_counts,
+                marker=dict(color=px.colors.qualitative.Set3[: len(issue_types)]),
+            )
         )
-        fig.update_layout(height=420, showlegend=False)
+        fig.update_layout(height=420, showlegend=False, xaxis_title="Issue Type", yaxis_title="Count")
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
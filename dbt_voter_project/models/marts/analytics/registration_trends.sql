@@ -1,10 +1,17 @@
 {{
     config(
-        alias='registration_trends'
+        alias='registration_trends',
+        materialized='external',
+        location=env_var('DBT_MARTS_DIR', '../airflow/include/data/processed/marts') ~ '/registration_trends',
+        format='parquet',
+        options={'partition_by': 'registration_year', 'overwrite': true}
     )
 }}
 
 -- Registration trends over time to illustrate voter growth patterns.
+-- Written as a Parquet dataset partitioned by registration year so the
+-- dashboard's date-window queries prune whole year files instead of
+-- scanning the full history.
 
 with voters as (
     select *
@@ -40,5 +47,8 @@ with_running_total as (
     from monthly_registrations
 )
 
-select * from with_running_total
+select
+    *,
+    year(registration_month) as registration_year
+from with_running_total
 order by registration_month desc